@@ -0,0 +1,81 @@
+# game_analytics.py
+# Analítica columnar (NumPy) sobre el catálogo de GameRecord: tienda más barata,
+# precio por hora y puntuación por dólar, calculados para todos los juegos a la vez.
+# NumPy se importa al construir el catálogo, no al importar este módulo.
+from game_records import STORES, records_from_results
+
+
+class GameCatalog:
+    def __init__(self, records: list):
+        import numpy as np
+        self.names = [r.name for r in records]
+        # Precios en centavos de dólar (juegos × tiendas); NaN si no hay precio en USD
+        self.prices = np.array(
+            [[_nan_if_none(r.price_cents(store)) for store in STORES] for r in records],
+            dtype=np.float64,
+        ).reshape(len(records), len(STORES))
+        self.metacritic = np.array([_nan_if_none(r.metacritic) for r in records], dtype=np.float64)
+        self.hltb_hours = np.array([_nan_if_none(r.hltb_hours) for r in records], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def analyze(self) -> dict:
+        import numpy as np
+        has_price = ~np.isnan(self.prices).all(axis=1)
+        # Los huecos valen inf para que argmin elija siempre un precio real
+        filled = np.where(np.isnan(self.prices), np.inf, self.prices)
+        cheapest_idx = np.argmin(filled, axis=1)
+        cheapest_cents = np.where(has_price, filled[np.arange(len(self)), cheapest_idx], np.nan)
+        dollars = cheapest_cents / 100
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            paid = dollars > 0
+            price_per_hour = np.where(paid & (self.hltb_hours > 0), dollars / self.hltb_hours, np.nan)
+            score_per_dollar = np.where(paid, self.metacritic / dollars, np.nan)
+
+        return {
+            "name": self.names,
+            "cheapest_store": [STORES[i] if ok else None for i, ok in zip(cheapest_idx.tolist(), has_price.tolist())],
+            "cheapest_cents": cheapest_cents,
+            "price_per_hour": price_per_hour,
+            "score_per_dollar": score_per_dollar,
+            "price_per_hour_rank": _rank(price_per_hour, descending=False),
+            "score_per_dollar_rank": _rank(score_per_dollar, descending=True),
+        }
+
+
+def _nan_if_none(value):
+    return float("nan") if value is None else value
+
+
+def _rank(values, descending: bool):
+    """Posición 1..n de cada juego; los NaN quedan al final y sin posición (0)."""
+    import numpy as np
+    valid = ~np.isnan(values)
+    keys = np.where(valid, -values if descending else values, np.inf)
+    order = np.argsort(keys, kind="stable")
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(1, len(values) + 1)
+    return np.where(valid, ranks, 0)
+
+
+def analyze_results(results: list) -> dict:
+    """Columnas de analítica por nombre de juego, listas para generate_html."""
+    columns = GameCatalog(records_from_results(results)).analyze()
+    rows = {}
+    for i, name in enumerate(columns["name"]):
+        rows[name] = {
+            "cheapest_store": columns["cheapest_store"][i],
+            "cheapest_cents": _none_if_nan(columns["cheapest_cents"][i]),
+            "price_per_hour": _none_if_nan(columns["price_per_hour"][i]),
+            "score_per_dollar": _none_if_nan(columns["score_per_dollar"][i]),
+            "price_per_hour_rank": int(columns["price_per_hour_rank"][i]) or None,
+            "score_per_dollar_rank": int(columns["score_per_dollar_rank"][i]) or None,
+        }
+    return rows
+
+
+def _none_if_nan(value):
+    value = float(value)
+    return None if value != value else value
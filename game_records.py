@@ -0,0 +1,119 @@
+# game_records.py
+# Registros tipados y compactos de cada juego, a partir de los textos que
+# devuelven los scrapers ("59.99 USD", "$19.99", "Free", "93", "405 Hours",
+# "No disponible"...). Los precios se guardan en centavos de dólar; los precios en
+# otra moneda (p. ej. "₡10.750" o "10750.00 CRC") quedan como None.
+import re
+
+STORES = ("steam", "playstation", "amazon")
+
+_NUMBER_RE = re.compile(r"\d[\d.,]*")
+_HOURS_RE = re.compile(r"(\d[\d.,]*)\s*(½)?\s*(hours?|hrs?|h|mins?|minutes?)?", re.I)
+_CURRENCY_CODE_RE = re.compile(r"\b([A-Z]{3})\b")
+# Los símbolos más largos primero, para que "R$" no se lea como "$"
+_CURRENCY_SYMBOLS = {"US$": "USD", "R$": "BRL", "$": "USD", "₡": "CRC", "€": "EUR", "£": "GBP", "¥": "JPY"}
+
+
+class GameRecord:
+    __slots__ = ("name", "steam_cents", "playstation_cents", "amazon_cents", "metacritic", "hltb_hours")
+
+    def __init__(self, name: str, steam_cents: int = None, playstation_cents: int = None,
+                 amazon_cents: int = None, metacritic: int = None, hltb_hours: float = None):
+        self.name = name
+        self.steam_cents = steam_cents
+        self.playstation_cents = playstation_cents
+        self.amazon_cents = amazon_cents
+        self.metacritic = metacritic
+        self.hltb_hours = hltb_hours
+
+    @classmethod
+    def from_result(cls, result: dict) -> "GameRecord":
+        return cls(
+            result["name"],
+            steam_cents=parse_price_cents(result.get("steam")),
+            playstation_cents=parse_price_cents(result.get("playstation")),
+            amazon_cents=parse_price_cents(result.get("amazon")),
+            metacritic=parse_score(result.get("metacritic")),
+            hltb_hours=parse_hours(result.get("hltb")),
+        )
+
+    def price_cents(self, store: str):
+        return getattr(self, f"{store}_cents")
+
+    def __repr__(self):
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"GameRecord({fields})"
+
+    def __eq__(self, other):
+        if not isinstance(other, GameRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+
+def _split_number(number: str) -> tuple:
+    number = number.rstrip(".,")
+    # El último separador es decimal solo si lo siguen 1 o 2 dígitos ("1,200" son miles)
+    last_sep = max(number.rfind("."), number.rfind(","))
+    if last_sep != -1 and len(number) - last_sep - 1 in (1, 2):
+        whole, frac = number[:last_sep], number[last_sep + 1:]
+    else:
+        whole, frac = number, ""
+    return whole.replace(".", "").replace(",", "") or "0", frac
+
+
+def parse_price(text: str) -> tuple:
+    """(centavos, moneda) a partir de "59.99 USD", "$1,299.99", "₡10.750" o "Free"; (None, None) si no hay precio."""
+    if not text:
+        return None, None
+    if text.strip().lower() in ("free", "gratis", "free to play"):
+        return 0, None
+    m = _NUMBER_RE.search(text)
+    if not m:
+        return None, None
+    whole, frac = _split_number(m.group(0))
+    code = _CURRENCY_CODE_RE.search(text)
+    currency = code.group(1) if code else None
+    if currency is None:
+        prefix, suffix = text[:m.start()].strip(), text[m.end():].strip()
+        currency = next((c for symbol, c in _CURRENCY_SYMBOLS.items()
+                         if prefix.endswith(symbol) or suffix.startswith(symbol)), None)
+    return int(whole) * 100 + int(frac.ljust(2, "0")), currency
+
+
+def parse_price_cents(text: str):
+    """Centavos de dólar; None si no hay precio o si está en otra moneda (o no se reconoce)."""
+    cents, currency = parse_price(text)
+    if cents is None or (cents > 0 and currency != "USD"):
+        return None
+    return cents
+
+
+def parse_score(text: str):
+    """Puntuación 0-100 a partir de "93"; None para "tbd" o "N/A"."""
+    if text is None:
+        return None
+    text = str(text).strip()
+    if text.isdigit() and 0 <= int(text) <= 100:
+        return int(text)
+    return None
+
+
+def parse_hours(text: str):
+    """Horas a partir de "405 Hours", "40½ Hours" o "45 Mins"; None para "No disponible"."""
+    if not text:
+        return None
+    m = _HOURS_RE.search(text)
+    if not m:
+        return None
+    whole, frac = _split_number(m.group(1))
+    hours = float(f"{whole}.{frac or 0}")
+    if m.group(2):
+        hours += 0.5
+    unit = (m.group(3) or "hours").lower()
+    if unit.startswith("min"):
+        hours /= 60
+    return hours
+
+
+def records_from_results(results: list) -> list:
+    return [GameRecord.from_result(r) for r in results]
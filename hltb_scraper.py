@@ -1,7 +1,73 @@
 import asyncio
+import argparse
 import json
-from playwright.async_api import async_playwright, Playwright
 from urllib.parse import quote
+from typing import TYPE_CHECKING
+from profiling import stage
+import profiling
+
+if TYPE_CHECKING:
+    from playwright.async_api import Playwright
+
+HLTB_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/125.0.0.0 Safari/537.36"
+)
+HLTB_VIEWPORT = {"width": 1920, "height": 1080}
+
+# Navegador persistente (modo --daemon) al que se conectan las ejecuciones por CDP
+HLTB_CDP_PORT = 9222
+HLTB_CDP_ENDPOINT = f"http://127.0.0.1:{HLTB_CDP_PORT}"
+HLTB_BROWSER_PROFILE_DIR = ".hltb_browser_profile"
+PAGE_RECYCLE_EVERY = 25
+
+
+async def serve_browser(headless_mode: bool = True):
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            HLTB_BROWSER_PROFILE_DIR,
+            headless=headless_mode,
+            user_agent=HLTB_USER_AGENT,
+            viewport=HLTB_VIEWPORT,
+            args=[
+                f"--remote-debugging-port={HLTB_CDP_PORT}",
+                f"--user-agent={HLTB_USER_AGENT}",
+                f"--window-size={HLTB_VIEWPORT['width']},{HLTB_VIEWPORT['height']}",
+            ],
+        )
+        # Primera navegación para dejar caché y cookies listas
+        page = context.pages[0] if context.pages else await context.new_page()
+        try:
+            await page.goto("https://howlongtobeat.com/", wait_until="domcontentloaded", timeout=30000)
+        except Exception as e:
+            print(f"⚠️ HLTB: Falló la navegación inicial: {e}")
+        print(f"✔ Navegador HLTB escuchando en {HLTB_CDP_ENDPOINT} (Ctrl+C para detener)")
+        closed = asyncio.Event()
+        context.on("close", lambda _: closed.set())
+        try:
+            await closed.wait()
+        finally:
+            await context.close()
+
+
+async def _open_context(p: "Playwright", headless_mode: bool):
+    """Devuelve (browser, context, attached); attached indica que se usa el daemon."""
+    try:
+        browser = await p.chromium.connect_over_cdp(HLTB_CDP_ENDPOINT, timeout=2000)
+        if browser.contexts:
+            return browser, browser.contexts[0], True
+        await browser.close()
+    except Exception:
+        pass
+    browser = await p.chromium.launch(headless=headless_mode)
+    context = await browser.new_context(
+        user_agent=HLTB_USER_AGENT,
+        viewport=HLTB_VIEWPORT,
+    )
+    return browser, context, False
+
 
 async def main():
     try:
@@ -18,32 +84,36 @@ async def main():
     headless_mode = True
     resultados = []
 
+    from playwright.async_api import async_playwright
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=headless_mode)
-        user_agent_string = (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/125.0.0.0 Safari/537.36"
-        )
-        context = await browser.new_context(
-            user_agent=user_agent_string,
-            viewport={"width": 1920, "height": 1080},
-        )
+        with stage("navegador"):
+            browser, context, attached = await _open_context(p, headless_mode)
+        page = None
+        page_uses = 0
 
         for juego in juegos:
-            page = await context.new_page()
+            if page is None or page_uses >= PAGE_RECYCLE_EVERY:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                page = await context.new_page()
+                page_uses = 0
+            page_uses += 1
 
             try:
-                search_url = f"https://howlongtobeat.com/?q={quote(juego)}"
-                await page.goto(
-                    search_url, wait_until="domcontentloaded", timeout=30000
-                )
-                await page.wait_for_selector(
-                    "div.GameCard_inside_blur__cP8_l", timeout=15000
-                )
-                first_link_element = await page.query_selector(
-                    "div.GameCard_inside_blur__cP8_l a"
-                )
+                with stage("busqueda"):
+                    search_url = f"https://howlongtobeat.com/?q={quote(juego)}"
+                    await page.goto(
+                        search_url, wait_until="domcontentloaded", timeout=30000
+                    )
+                    await page.wait_for_selector(
+                        "div.GameCard_inside_blur__cP8_l", timeout=15000
+                    )
+                    first_link_element = await page.query_selector(
+                        "div.GameCard_inside_blur__cP8_l a"
+                    )
                 if not first_link_element:
                     raise Exception("No se encontró el primer juego")
 
@@ -53,27 +123,28 @@ async def main():
                     if href.startswith("http")
                     else f"https://howlongtobeat.com{href}"
                 )
-                await page.goto(
-                    full_url, wait_until="domcontentloaded", timeout=30000
-                )
-                await page.wait_for_selector(
-                    "div.GameHeader_profile_header__q_PID", timeout=10000
-                )
-                await page.wait_for_selector(
-                    "li.GameStats_short__tSJ6I.time_100 h5", timeout=10000
-                )
-
-                data = await page.evaluate(
+                with stage("ficha"):
+                    await page.goto(
+                        full_url, wait_until="domcontentloaded", timeout=30000
+                    )
+                    await page.wait_for_selector(
+                        "div.GameHeader_profile_header__q_PID", timeout=10000
+                    )
+                    await page.wait_for_selector(
+                        "li.GameStats_short__tSJ6I.time_100 h5", timeout=10000
+                    )
+
+                    data = await page.evaluate(
+                        """
+                        () => {
+                            const nameEl = document.querySelector('div.GameHeader_profile_header__q_PID');
+                            const timeEl = document.querySelector('li.GameStats_short__tSJ6I.time_100 h5');
+                            const name = nameEl?.textContent.trim() ?? 'Nombre no disponible';
+                            const time = timeEl?.textContent.trim() ?? 'Duración no disponible';
+                            return { name, time };
+                        }
                     """
-                    () => {
-                        const nameEl = document.querySelector('div.GameHeader_profile_header__q_PID');
-                        const timeEl = document.querySelector('li.GameStats_short__tSJ6I.time_100 h5');
-                        const name = nameEl?.textContent.trim() ?? 'Nombre no disponible';
-                        const time = timeEl?.textContent.trim() ?? 'Duración no disponible';
-                        return { name, time };
-                    }
-                """
-                )
+                    )
 
                 resultados.append(data)
 
@@ -88,12 +159,44 @@ async def main():
                 with open("hltb_times.txt", "a", encoding="utf-8") as txt_file:
                     txt_file.write(f"{juego} — No disponible\n")
 
+                # Página en estado desconocido: se recicla para el siguiente juego
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+                page = None
+
             finally:
-                await page.close()
-                await asyncio.sleep(1.5)
+                with stage("espera"): await asyncio.sleep(1.5)
 
-        await context.close()
-        await browser.close()
+        if page is not None:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        if not attached:
+            await context.close()
+            await browser.close()
+
+
+def cli(argv: list = None):
+    parser = argparse.ArgumentParser(description="Tiempos de HowLongToBeat para los juegos de games.txt")
+    parser.add_argument("--daemon", action="store_true",
+                        help=f"Mantiene un navegador listo en {HLTB_CDP_ENDPOINT} para las siguientes ejecuciones")
+    parser.add_argument("--profile", action="store_true", help="Perfila cada etapa y guarda el resultado en profiles/")
+    args = parser.parse_args(argv)
+    if args.profile and args.daemon:
+        parser.error("--profile no se puede combinar con --daemon")
+
+    if args.profile:
+        profiling.start("hltb_scraper")
+    try:
+        asyncio.run(serve_browser() if args.daemon else main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        profiling.stop()
 
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    cli()
\ No newline at end of file
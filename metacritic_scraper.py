@@ -2,9 +2,14 @@
 import os
 import time
 import re
+import argparse
 import urllib.parse
-import requests
-from bs4 import BeautifulSoup
+from typing import TYPE_CHECKING
+from profiling import stage
+import profiling
+
+if TYPE_CHECKING:
+    import requests
 
 # Encabezados globales para todas las peticiones HTTP
 HEADERS = {
@@ -42,7 +47,9 @@ def _clean_filename(name):
     name = re.sub(r'\s+', '_', name)
     return name[:50]
 
-def _fetch_single_metacritic_score(game_name: str, session: requests.Session) -> str:
+def _fetch_single_metacritic_score(game_name: str, session: "requests.Session") -> str:
+    import requests
+    from bs4 import BeautifulSoup
     search_term_encoded = urllib.parse.quote(game_name)
     url = f"https://www.metacritic.com/search/{search_term_encoded}/"
     html_content_for_debug = ""
@@ -54,7 +61,7 @@ def _fetch_single_metacritic_score(game_name: str, session: requests.Session) ->
         r.raise_for_status()
         actual_url = r.url
         html_content_for_debug = r.text
-        soup = BeautifulSoup(r.text, "html.parser")
+        with stage("bs4_parse"): soup = BeautifulSoup(r.text, "html.parser")
 
         score_selectors = [
             'div[class*="c-siteReviewScore"]:not([class*="user"]) span',
@@ -111,6 +118,7 @@ def _fetch_single_metacritic_score(game_name: str, session: requests.Session) ->
         return "N/A"
 
 def scrape_and_save_metacritic_scores(games_list: list, output_filename: str, delay_seconds: int = 5):
+    import requests
     if not games_list:
         return
 
@@ -119,23 +127,25 @@ def scrape_and_save_metacritic_scores(games_list: list, output_filename: str, de
 
     with requests.Session() as session:
         session.headers.update(HEADERS)
-        try:
-            session.get("https://www.metacritic.com/", timeout=15)
-        except requests.RequestException as e:
-            print(f"  Metacritic: Falló GET inicial a metacritic.com: {e}")
+        with stage("sesion_inicial"):
+            try:
+                session.get("https://www.metacritic.com/", timeout=15)
+            except requests.RequestException as e:
+                print(f"  Metacritic: Falló GET inicial a metacritic.com: {e}")
 
         for i, game_name in enumerate(games_list):
-            score = _fetch_single_metacritic_score(game_name, session)
+            with stage("metacritic"): score = _fetch_single_metacritic_score(game_name, session)
             scores_data[game_name] = score
             if score != "N/A" and score != "tbd":
                 found_any_score = True
             print(f"  Metacritic ({i+1}/{len(games_list)}): «{game_name}» → {score}")
             if i < len(games_list) - 1:
-                time.sleep(delay_seconds)
+                with stage("espera"): time.sleep(delay_seconds)
 
-    with open(output_filename, "w", encoding="utf-8") as f:
-        for game_name, score in scores_data.items():
-            f.write(f"{game_name}:{score}\n")
+    with stage("guardar"):
+        with open(output_filename, "w", encoding="utf-8") as f:
+            for game_name, score in scores_data.items():
+                f.write(f"{game_name}:{score}\n")
 
 def main():
     games_to_scrape = read_games(GAMES_FILE_PATH)
@@ -143,4 +153,18 @@ def main():
         scrape_and_save_metacritic_scores(games_to_scrape, METACRITIC_SCORES_FILE, delay_seconds=5)
 
 
-main()
\ No newline at end of file
+def cli(argv: list = None):
+    parser = argparse.ArgumentParser(description="Puntuaciones de Metacritic para los juegos de games.txt")
+    parser.add_argument("--profile", action="store_true", help="Perfila cada etapa y guarda el resultado en profiles/")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profiling.start("metacritic_scraper")
+        try: main()
+        finally: profiling.stop()
+    else:
+        main()
+
+
+if __name__ == "__main__":
+    cli()
\ No newline at end of file
@@ -0,0 +1,174 @@
+# profiling.py
+# Perfilado opcional (--profile) por etapa y por fuente, sin dependencias externas.
+# Un hilo muestrea periódicamente las pilas de todos los hilos; cada muestra se
+# etiqueta con las etapas activas de su hilo (ver stage()). Al terminar se
+# escriben las pilas colapsadas (formato flamegraph.pl/speedscope), un flame
+# graph SVG y un resumen con las funciones más costosas.
+import os
+import sys
+import time
+import threading
+import contextlib
+from collections import Counter
+
+PROFILES_DIR = "profiles"
+SAMPLE_INTERVAL_SECONDS = 0.005
+TOP_N = 25
+
+_active = None
+
+
+class StageProfiler:
+    def __init__(self, run_name: str, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.run_name = run_name
+        self.interval = interval
+        self.samples = Counter()
+        self.stage_times = Counter()
+        self._thread_stages = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._started_at = 0.0
+        self.elapsed = 0.0
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started_at
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        stages = self._thread_stages.setdefault(threading.get_ident(), [])
+        stages.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[";".join(stages)] += time.perf_counter() - t0
+            stages.pop()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                stages = [f"[{name}]" for name in self._thread_stages.get(ident) or ["sin etapa"]]
+                self.samples[tuple(stages + stack)] += 1
+
+    def write(self, output_dir: str = PROFILES_DIR, top_n: int = TOP_N) -> str:
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, f"{self.run_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{';'.join(stack)} {count}\n")
+        with open(base + ".svg", "w", encoding="utf-8") as f:
+            f.write(_flamegraph_svg(self.samples, f"{self.run_name} ({self.elapsed:.2f} s)"))
+        summary = self.summary(top_n)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+        return base
+
+    def summary(self, top_n: int = TOP_N) -> str:
+        total = sum(self.samples.values()) or 1
+        self_counts, inclusive_counts = Counter(), Counter()
+        for stack, count in self.samples.items():
+            frames = [label for label in stack if not label.startswith("[")]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                inclusive_counts[label] += count
+
+        lines = [f"Perfil «{self.run_name}»: {self.elapsed:.2f} s, {total} muestras cada {self.interval * 1000:.0f} ms", ""]
+        lines.append("Tiempo por etapa (reloj):")
+        for name, seconds in sorted(self.stage_times.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {seconds:9.3f} s  {name}")
+        lines.append("")
+        lines.append(f"Top {top_n} funciones (tiempo propio):")
+        for label, count in self_counts.most_common(top_n):
+            lines.append(f"  {100 * count / total:6.2f}%  {100 * inclusive_counts[label] / total:6.2f}% acum.  {label}")
+        return "\n".join(lines) + "\n"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _flamegraph_svg(samples: Counter, title: str, width: int = 1200, row_height: int = 16) -> str:
+    root = {"children": {}, "count": 0}
+    for stack, count in samples.items():
+        root["count"] += count
+        node = root
+        for label in stack:
+            node = node["children"].setdefault(label, {"children": {}, "count": 0})
+            node["count"] += count
+
+    rects = []
+    max_depth = [0]
+
+    def layout(node, x, depth, scale):
+        for label, child in sorted(node["children"].items()):
+            w = child["count"] * scale
+            if w >= 0.5:
+                rects.append((x, depth, w, label, child["count"]))
+                max_depth[0] = max(max_depth[0], depth)
+                layout(child, x, depth + 1, scale)
+            x += w
+
+    total = root["count"] or 1
+    layout(root, 0.0, 0, width / total)
+    top = 2 * row_height
+    height = top + (max_depth[0] + 1) * row_height + 10
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="{width / 2}" y="{row_height}" text-anchor="middle" font-size="14">{_xml_escape(title)}</text>',
+    ]
+    for x, depth, w, label, count in rects:
+        y = height - 10 - (depth + 1) * row_height
+        hue = 10 + (hash(label) % 40)
+        text = _xml_escape(label[: int(w / 7)]) if w > 21 else ""
+        out.append(
+            f'<g><title>{_xml_escape(label)} ({count} muestras, {100 * count / total:.2f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" fill="hsl({hue},90%,60%)"/>'
+            f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{text}</text></g>'
+        )
+    out.append("</svg>\n")
+    return "\n".join(out)
+
+
+def _xml_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def start(run_name: str) -> StageProfiler:
+    global _active
+    _active = StageProfiler(run_name)
+    _active.start()
+    return _active
+
+
+def stop(top_n: int = TOP_N):
+    global _active
+    if _active is None:
+        return
+    profiler, _active = _active, None
+    profiler.stop()
+    base = profiler.write(top_n=top_n)
+    print(profiler.summary(top_n))
+    print(f"✔ Perfil guardado en '{base}.collapsed', '{base}.svg' y '{base}.txt'")
+
+
+def stage(name: str):
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
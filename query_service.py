@@ -0,0 +1,240 @@
+# query_service.py
+# Servicio HTTP/JSON local sobre los resultados guardados en results.json.
+# Las consultas se responden desde un índice en memoria; si una entrada está
+# vieja se devuelve igual y se refresca en segundo plano con scraper.scrape_game,
+# con un único refresco en curso por juego. Un refresco nunca reemplaza un precio
+# válido (ni una puntuación o tiempo) por "N/A"; si no trae ningún precio cuenta
+# como fallo y se reintenta más tarde con espera exponencial. Cada entrada guarda
+# su fetched_at en results.json; los archivos de Metacritic y HLTB se leen junto a él.
+#
+#   GET /game?name=Minecraft          → entrada del juego (404 si no existe)
+#   GET /search?prefix=gr&limit=10    → juegos cuyo nombre empieza por el prefijo (limit 1-50)
+#   GET /health                       → estado del índice
+import os
+import json
+import time
+import bisect
+import argparse
+import threading
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import scraper
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+STALE_AFTER_SECONDS = 6 * 60 * 60
+REFRESH_WORKERS = 3
+RETRY_BACKOFF_SECONDS = 60
+PRICE_FIELDS = ("steam", "playstation", "amazon")
+# Valor que devuelve scrape_game cuando no encuentra el dato
+MISSING_VALUES = {"steam": "N/A", "playstation": "N/A", "amazon": "N/A", "metacritic": "N/A", "hltb": "No disponible"}
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class GameIndex:
+    def __init__(self, results_path: str = scraper.RESULTS_FILE, stale_after: float = STALE_AFTER_SECONDS,
+                 refresh_workers: int = REFRESH_WORKERS):
+        self.results_path = results_path
+        self.stale_after = stale_after
+        self._entries = {}
+        self._sorted_keys = []
+        self._steam_matrix = None
+        self._inflight = {}
+        self._retry = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=refresh_workers,
+                                                               thread_name_prefix="refresh")
+        self._metacritic_scores = {}
+        self._hltb_times = {}
+        self._loaded_mtime_ns = None
+
+    def load(self):
+        self._loaded_mtime_ns = os.stat(self.results_path).st_mtime_ns
+        results, self._steam_matrix, _ = scraper.load_results(self.results_path)
+        # Resultados escritos por scraper.py no traen fetched_at: se usa la fecha del archivo
+        file_mtime = self._loaded_mtime_ns / 1e9
+        data_dir = os.path.dirname(os.path.abspath(self.results_path))
+        self._metacritic_scores = scraper.load_metacritic_scores(os.path.join(data_dir, scraper.METACRITIC_SCORES_FILE))
+        self._hltb_times = scraper.load_hltb_times(os.path.join(data_dir, scraper.HLTB_TIMES_FILE))
+        entries = {_normalize(r["name"]): (r, r.pop("fetched_at", file_mtime)) for r in results}
+        with self._lock:
+            self._entries = entries
+            self._sorted_keys = sorted(entries)
+        print(f"✔ Índice cargado con {len(entries)} juegos desde '{self.results_path}'")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, name: str, force_refresh: bool = False):
+        key = _normalize(name)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, fetched_at = entry
+        stale = self._is_stale(fetched_at)
+        if force_refresh or (stale and self._can_retry(key)):
+            self.refresh(key)
+        return self._payload(key, result, fetched_at, stale)
+
+    def search(self, prefix: str, limit: int = SEARCH_LIMIT) -> list:
+        prefix = _normalize(prefix)
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        keys = self._sorted_keys
+        start = bisect.bisect_left(keys, prefix)
+        matches = []
+        for key in keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            result, fetched_at = self._entries[key]
+            stale = self._is_stale(fetched_at)
+            if stale and self._can_retry(key):
+                self.refresh(key)
+            matches.append(self._payload(key, result, fetched_at, stale))
+        return matches
+
+    def _is_stale(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at > self.stale_after
+
+    def _can_retry(self, key: str) -> bool:
+        retry = self._retry.get(key)
+        return retry is None or time.time() >= retry[0]
+
+    def refresh(self, key: str) -> concurrent.futures.Future:
+        # Varias peticiones del mismo juego comparten el refresco en curso
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._refresh, key)
+                self._inflight[key] = future
+            return future
+
+    def _refresh(self, key: str):
+        try:
+            previous = self._entries[key][0]
+            result = scraper.scrape_game(previous["name"], self._metacritic_scores, self._hltb_times)
+            if all(result.get(field) == "N/A" for field in PRICE_FIELDS) and \
+                    any(previous.get(field, "N/A") != "N/A" for field in PRICE_FIELDS):
+                raise RuntimeError("ninguna tienda devolvió precio")
+            # Una tienda caída o un dato que falta no borra el último valor conocido
+            for field, missing in MISSING_VALUES.items():
+                if result.get(field, missing) == missing and previous.get(field, missing) != missing:
+                    result[field] = previous[field]
+            fetched_at = time.time()
+            with self._lock:
+                self._entries[key] = (result, fetched_at)
+                self._retry.pop(key, None)
+            self._save(key, result, fetched_at)
+            return result
+        except Exception as e:
+            with self._lock:
+                failures = self._retry.get(key, (0, 0))[1] + 1
+                delay = min(RETRY_BACKOFF_SECONDS * 2 ** (failures - 1), self.stale_after)
+                self._retry[key] = (time.time() + delay, failures)
+            print(f"⚠️ Error refrescando «{key}»: {e}. Reintento en {delay:.0f} s")
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _save(self, key: str, result: dict, fetched_at: float):
+        with self._save_lock:
+            try:
+                # Si scraper.py reescribió results.json mientras tanto, se recarga
+                # y solo se aplica encima el juego recién refrescado
+                if os.stat(self.results_path).st_mtime_ns != self._loaded_mtime_ns:
+                    print(f"ℹ️ '{self.results_path}' cambió en disco; recargando el índice")
+                    self.load()
+                    with self._lock:
+                        if key in self._entries:
+                            self._entries[key] = (result, fetched_at)
+                with self._lock:
+                    results = [dict(r, fetched_at=t) for r, t in self._entries.values()]
+                scraper.save_results(results, self._steam_matrix, self.results_path)
+                self._loaded_mtime_ns = os.stat(self.results_path).st_mtime_ns
+            except (OSError, ValueError) as e:
+                print(f"⚠️ No se pudo guardar '{self.results_path}': {e}")
+
+    def _payload(self, key: str, result: dict, fetched_at: float, stale: bool) -> dict:
+        return dict(result, fetched_at=fetched_at, stale=stale, refreshing=key in self._inflight)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    index: GameIndex = None
+
+    def do_GET(self):
+        t0 = time.perf_counter()
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path == "/game":
+            name = params.get("name", [""])[0]
+            if not name:
+                return self._send(400, {"error": "Falta el parámetro 'name'"}, t0)
+            entry = self.index.get(name, force_refresh=params.get("refresh", ["0"])[0] == "1")
+            if entry is None:
+                return self._send(404, {"error": f"Juego «{name}» no encontrado"}, t0)
+            return self._send(200, entry, t0)
+        if url.path == "/search":
+            try: limit = int(params.get("limit", [SEARCH_LIMIT])[0])
+            except ValueError: return self._send(400, {"error": "'limit' debe ser un entero"}, t0)
+            if limit < 1:
+                return self._send(400, {"error": "'limit' debe ser al menos 1"}, t0)
+            return self._send(200, {"results": self.index.search(params.get("prefix", [""])[0], limit)}, t0)
+        if url.path == "/health":
+            return self._send(200, {"games": len(self.index), "refreshing": len(self.index._inflight)}, t0)
+        self._send(404, {"error": "Ruta no encontrada"}, t0)
+
+    def _send(self, status: int, body: dict, t0: float):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Lookup-Micros", f"{(time.perf_counter() - t0) * 1e6:.0f}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, results_path: str = scraper.RESULTS_FILE,
+          stale_after: float = STALE_AFTER_SECONDS):
+    index = GameIndex(results_path, stale_after)
+    index.load()
+    handler = type("BoundQueryHandler", (QueryHandler,), {"index": index})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"✔ Servicio de consultas en http://{host}:{port} (Ctrl+C para detener)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        index.shutdown()
+
+
+def cli(argv: list = None):
+    parser = argparse.ArgumentParser(description="Servicio de consultas JSON sobre los precios guardados")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--results", default=scraper.RESULTS_FILE, help="Resultados generados por scraper.py")
+    parser.add_argument("--stale-after", type=float, default=STALE_AFTER_SECONDS,
+                        help="Segundos tras los que una entrada se refresca en segundo plano")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.results):
+        print(f"❌ Archivo '{args.results}' no encontrado. Ejecuta primero scraper.py.")
+        return
+    serve(args.host, args.port, args.results, args.stale_after)
+
+
+if __name__ == "__main__":
+    cli()
@@ -2,10 +2,14 @@ import os
 import time
 import re
 import json
+import argparse
 import urllib.parse
-import requests
-from bs4 import BeautifulSoup
-import concurrent.futures
+import threading
+from profiling import stage
+import profiling
+
+# requests, bs4 y concurrent.futures se importan dentro de cada función para que
+# importar este módulo (o regenerar el reporte con --report-only) sea inmediato.
 
 # Encabezados globales para todas las peticiones HTTP
 HEADERS = {
@@ -23,8 +27,21 @@ HEADERS = {
 
 METACRITIC_SCORES_FILE = "metacritic_scores.txt"
 HLTB_TIMES_FILE = "hltb_times.txt" 
+RESULTS_FILE = "results.json"
 DEBUG_PLAYSTATION_HTML = False 
 
+# Matriz de precios de Steam por región (juego × país), activada con --steam-regions
+STEAM_REGIONS = [
+    "US", "CR", "MX", "AR", "BR", "CL", "CO", "PE",
+    "CA", "GB", "DE", "ES", "JP", "AU", "IN",
+]
+STEAM_APPIDS_CACHE_FILE = "steam_appids.json"
+STEAM_APPDETAILS_BATCH_SIZE = 50
+# La API de la tienda admite ~200 peticiones cada 5 minutos (0.67/s)
+STEAM_REQUESTS_PER_SECOND = 0.6
+STEAM_MAX_RETRIES = 3
+STEAM_RETRY_BACKOFF_SECONDS = 30
+
 def read_games(file_path: str) -> list:
     games = []
     with open(file_path, encoding="utf-8") as f:
@@ -36,6 +53,7 @@ def read_games(file_path: str) -> list:
     return games
 
 def get_steam_price(name: str) -> str:
+    import requests
     params = {"term": name, "l": "english", "cc": "US"}
     r = requests.get(
         "https://store.steampowered.com/api/storesearch/",
@@ -68,7 +86,149 @@ def get_steam_price(name: str) -> str:
     price = po["final"] / 100
     return f"{price:.2f} {po['currency']}"
 
+class _HostRateLimiter:
+    """Espacia las peticiones a un mismo host, compartido entre hilos."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        # Tras un 429 ningún hilo vuelve a pedir hasta que pase la espera
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+_steam_rate_limiter = _HostRateLimiter(STEAM_REQUESTS_PER_SECOND)
+
+def _steam_get(url: str, params: dict, timeout: int):
+    import requests
+    for attempt in range(STEAM_MAX_RETRIES + 1):
+        _steam_rate_limiter.wait()
+        r = requests.get(url, params=params, headers=HEADERS, timeout=timeout)
+        if r.status_code != 429 or attempt == STEAM_MAX_RETRIES:
+            break
+        try: delay = float(r.headers.get("Retry-After", ""))
+        except ValueError: delay = STEAM_RETRY_BACKOFF_SECONDS * 2 ** attempt
+        print(f"  Steam: 429, reintentando en {delay:.0f} s...")
+        _steam_rate_limiter.pause(delay)
+    r.raise_for_status()
+    return r
+
+def load_steam_appids(input_filename: str) -> dict:
+    if not os.path.exists(input_filename):
+        return {}
+    try:
+        with open(input_filename, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def save_steam_appids(appids: dict, output_filename: str):
+    with open(output_filename, "w", encoding="utf-8") as f:
+        json.dump(appids, f, ensure_ascii=False, indent=2)
+
+def get_steam_app_info(name: str):
+    # Los lotes de precios devuelven data vacía para los juegos gratis, por eso
+    # is_free se consulta una sola vez aquí y queda en la caché de appids
+    r = _steam_get(
+        "https://store.steampowered.com/api/storesearch/",
+        params={"term": name, "l": "english", "cc": "US"},
+        timeout=10,
+    )
+    items = r.json().get("items", [])
+    if not items:
+        return None
+    appid = items[0]["id"]
+    r2 = _steam_get(
+        "https://store.steampowered.com/api/appdetails/",
+        params={"appids": appid, "cc": "US", "l": "english", "filters": "basic"},
+        timeout=10,
+    )
+    data_info = (r2.json().get(str(appid)) or {}).get("data")
+    is_free = bool(data_info.get("is_free", False)) if isinstance(data_info, dict) else False
+    return {"appid": appid, "is_free": is_free}
+
+def get_steam_prices_batch(appids: list, cc: str) -> dict:
+    with stage(f"steam_{cc}"):
+        return _get_steam_prices_batch(appids, cc)
+
+def _get_steam_prices_batch(appids: list, cc: str) -> dict:
+    # Con varios appids, appdetails solo acepta el filtro price_overview
+    r = _steam_get(
+        "https://store.steampowered.com/api/appdetails/",
+        params={"appids": ",".join(str(a) for a in appids), "cc": cc, "filters": "price_overview"},
+        timeout=15,
+    )
+    data = r.json() or {}
+    prices = {}
+    for appid in appids:
+        info = data.get(str(appid)) or {}
+        data_info = info.get("data") if info.get("success") else None
+        po = data_info.get("price_overview") if isinstance(data_info, dict) else None
+        if not po:
+            prices[appid] = "N/A"
+            continue
+        prices[appid] = f"{po['final'] / 100:.2f} {po['currency']}"
+    return prices
+
+def scrape_steam_price_matrix(games: list, regions: list = None, max_workers: int = 7,
+                              cache_path: str = STEAM_APPIDS_CACHE_FILE) -> dict:
+    import concurrent.futures
+    regions = regions or STEAM_REGIONS
+    matrix = {"regions": list(regions), "prices": {name: {cc: "N/A" for cc in regions} for name in games}}
+    if not games: return matrix
+
+    # Solo se guardan juegos encontrados; los demás se vuelven a buscar en la siguiente ejecución
+    apps = {name: info for name, info in load_steam_appids(cache_path).items() if isinstance(info, dict)}
+    missing = [name for name in games if name not in apps]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if missing:
+            print(f"ℹ️ Resolviendo appids de Steam para {len(missing)} juegos...")
+            futures = {executor.submit(get_steam_app_info, name): name for name in missing}
+            for future in concurrent.futures.as_completed(futures):
+                name = futures[future]
+                try: info = future.result()
+                except Exception as e:
+                    print(f"⚠️ Error appid Steam «{name}»: {e}")
+                    continue
+                if info: apps[name] = info
+            try: save_steam_appids(apps, cache_path)
+            except OSError as e: print(f"⚠️ No se pudo guardar '{cache_path}': {e}")
+
+        known = sorted({apps[name]["appid"] for name in games if name in apps})
+        batches = [known[i:i + STEAM_APPDETAILS_BATCH_SIZE] for i in range(0, len(known), STEAM_APPDETAILS_BATCH_SIZE)]
+        print(f"ℹ️ Consultando {len(batches) * len(regions)} lotes de precios Steam ({len(known)} juegos × {len(regions)} regiones)...")
+        futures = {executor.submit(get_steam_prices_batch, batch, cc): cc for batch in batches for cc in regions}
+        by_appid = {}
+        for future in concurrent.futures.as_completed(futures):
+            cc = futures[future]
+            try: batch_prices = future.result()
+            except Exception as e:
+                print(f"⚠️ Error lote Steam ({cc}): {e}")
+                continue
+            for appid, price in batch_prices.items():
+                by_appid.setdefault(appid, {})[cc] = price
+
+    for name in games:
+        info = apps.get(name)
+        if not info: continue
+        row = matrix["prices"][name]
+        row.update(by_appid.get(info["appid"], {}))
+        if info.get("is_free"):
+            for cc, price in row.items():
+                if price == "N/A": row[cc] = "Free"
+    return matrix
+
 def get_playstation_price(name: str) -> str:
+    import requests
+    from bs4 import BeautifulSoup
     search_term_encoded = urllib.parse.quote(name)
     url = f"https://store.playstation.com/en-us/search/{search_term_encoded}"
     session = requests.Session()
@@ -81,7 +241,7 @@ def get_playstation_price(name: str) -> str:
         if r.status_code == 404: return "N/A"
         r.raise_for_status()
         html_content_for_debug = r.text
-        soup = BeautifulSoup(r.text, "html.parser")
+        with stage("bs4_parse"): soup = BeautifulSoup(r.text, "html.parser")
         price_selectors = [
             'span[data-qa$="display-price"]', 'span[data-qa$="finalPrice"]',
             'div[data-qa*="price"] > span', 'span[class*="price"][class*="sales"]',
@@ -128,6 +288,8 @@ def get_playstation_price(name: str) -> str:
         return "N/A"
 
 def get_amazon_price(name: str) -> str:
+    import requests
+    from bs4 import BeautifulSoup
     session = requests.Session()
     session.headers.update(HEADERS)
     session.cookies.set("i18n-prefs", "USD", domain="www.amazon.com")
@@ -137,10 +299,10 @@ def get_amazon_price(name: str) -> str:
         r = session.get(url, timeout=15)
         r.raise_for_status()
     except requests.exceptions.RequestException: return "N/A"
-    soup = BeautifulSoup(r.text, "html.parser")
+    with stage("bs4_parse"): soup = BeautifulSoup(r.text, "html.parser")
     results = soup.select('div[data-component-type="s-search-result"]')
     if not results:
-        m = re.search(r"\$\s*([0-9,]+(?:\.[0-9]{1,2})?)", soup.get_text())
+        with stage("regex_fallback"): m = re.search(r"\$\s*([0-9,]+(?:\.[0-9]{1,2})?)", soup.get_text())
         if m: return f"${m.group(1).replace(',', '')}"
         return "N/A"
     for item in results:
@@ -160,7 +322,7 @@ def get_amazon_price(name: str) -> str:
             if free_download_text:
                 parent_text = free_download_text.parent.get_text(strip=True, separator=" ").lower()
                 if "free download" in parent_text or parent_text == "free": return "Free"
-    m = re.search(r"\$\s*([0-9,]+(?:\.[0-9]{1,2})?)", soup.get_text())
+    with stage("regex_fallback"): m = re.search(r"\$\s*([0-9,]+(?:\.[0-9]{1,2})?)", soup.get_text())
     if m: return f"${m.group(1).replace(',', '')}"
     return "N/A"
 
@@ -199,12 +361,15 @@ def load_hltb_times(input_filename: str) -> dict:
 
 def scrape_game(name: str, all_metacritic_scores: dict, all_hltb_times: dict) -> dict:
     s, ps, a = "N/A", "N/A", "N/A"
-    try: s = get_steam_price(name)
-    except Exception as e: print(f"⚠️ Error Steam «{name}»: {e}")
-    try: ps = get_playstation_price(name)
-    except Exception as e: print(f"⚠️ Error PlayStation «{name}»: {e}")
-    try: a = get_amazon_price(name)
-    except Exception as e: print(f"⚠️ Error Amazon «{name}»: {e}")
+    with stage("steam"):
+        try: s = get_steam_price(name)
+        except Exception as e: print(f"⚠️ Error Steam «{name}»: {e}")
+    with stage("playstation"):
+        try: ps = get_playstation_price(name)
+        except Exception as e: print(f"⚠️ Error PlayStation «{name}»: {e}")
+    with stage("amazon"):
+        try: a = get_amazon_price(name)
+        except Exception as e: print(f"⚠️ Error Amazon «{name}»: {e}")
     
     m_score = all_metacritic_scores.get(name, "N/A")
     hltb_time = all_hltb_times.get(name, "No disponible")
@@ -215,6 +380,7 @@ def scrape_game(name: str, all_metacritic_scores: dict, all_hltb_times: dict) ->
     }
 
 def scrape_all_prices(games: list, all_metacritic_scores: dict, all_hltb_times: dict, max_workers: int = 7) -> list:
+    import concurrent.futures
     results = []
     if not games: return results
     print(f"ℹ️ Iniciando scraping de precios para {len(games)} juegos (max_workers={max_workers})...")
@@ -237,7 +403,96 @@ def scrape_all_prices(games: list, all_metacritic_scores: dict, all_hltb_times:
             results.append(res)
     return results
 
-def generate_html(results: list, images_path="images.json"):
+def save_results(results: list, steam_matrix: dict, output_filename: str = RESULTS_FILE, analytics: dict = None):
+    # analytics se guarda ya calculada para que --report-only no necesite numpy.
+    # Se escribe en un temporal y se reemplaza para no dejar nunca un archivo a medias
+    tmp_filename = f"{output_filename}.tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        json.dump({"results": results, "steam_matrix": steam_matrix, "analytics": analytics},
+                  f, ensure_ascii=False, indent=2)
+    os.replace(tmp_filename, output_filename)
+
+def load_results(input_filename: str = RESULTS_FILE):
+    with open(input_filename, encoding="utf-8") as f: data = json.load(f)
+    return data.get("results", []), data.get("steam_matrix"), data.get("analytics")
+
+def rebuild_report(input_filename: str = RESULTS_FILE) -> bool:
+    # Regenera report.html desde la última ejecución, sin red ni dependencias pesadas
+    if not os.path.exists(input_filename):
+        print(f"❌ Archivo '{input_filename}' no encontrado. Ejecuta primero el scraper completo.")
+        return False
+    with stage("cargar_datos"):
+        results, steam_matrix, analytics = load_results(input_filename)
+        metacritic_scores = load_metacritic_scores(METACRITIC_SCORES_FILE)
+        hltb_times = load_hltb_times(HLTB_TIMES_FILE)
+        inputs_changed = False
+        for r in results:
+            metacritic = metacritic_scores.get(r["name"], r.get("metacritic", "N/A"))
+            hltb = hltb_times.get(r["name"], r.get("hltb", "No disponible"))
+            inputs_changed |= metacritic != r.get("metacritic") or hltb != r.get("hltb")
+            r["metacritic"], r["hltb"] = metacritic, hltb
+    # La analítica guardada solo se recalcula (con numpy) si cambiaron sus datos de entrada
+    if analytics is None or inputs_changed:
+        with stage("analitica"): analytics = analyze_prices(results)
+    with stage("generar_html"): generate_html(results, steam_matrix=steam_matrix, analytics=analytics)
+    return True
+
+def analyze_prices(results: list):
+    from game_analytics import analyze_results
+    try:
+        return analyze_results(results)
+    except ImportError as e:
+        print(f"⚠️ Analítica de valor desactivada ({e}). Instala numpy para habilitarla.")
+        return None
+
+def generate_value_table_html(results: list, analytics: dict) -> str:
+    store_labels = {"steam": "Steam", "playstation": "PlayStation", "amazon": "Amazon"}
+    rows = ""
+    for r in results:
+        a = analytics.get(r["name"], {})
+        cents, pph, spd = a.get("cheapest_cents"), a.get("price_per_hour"), a.get("score_per_dollar")
+        price_text = "N/A" if cents is None else ("Free" if cents == 0 else f"${cents / 100:.2f}")
+        cells = [
+            (r["name"].lower(), r["name"]),
+            (cents if cents is not None else "", price_text if cents is None else f"{price_text} ({store_labels[a['cheapest_store']]})"),
+            (pph if pph is not None else "", "N/A" if pph is None else f"${pph:.2f}"),
+            (spd if spd is not None else "", "N/A" if spd is None else f"{spd:.2f}"),
+            (a.get("price_per_hour_rank") or "", a.get("price_per_hour_rank") or "—"),
+            (a.get("score_per_dollar_rank") or "", a.get("score_per_dollar_rank") or "—"),
+        ]
+        rows += "          <tr>" + "".join(f'<td data-value="{v}">{t}</td>' for v, t in cells) + "</tr>\n"
+    headers = ["Juego", "Más barato", "Precio por hora", "Metacritic por dólar", "Rank $/h", "Rank puntos/$"]
+    header_html = "".join(f'<th data-col="{i}">{h}</th>' for i, h in enumerate(headers))
+    return f"""    <h2 class="section-title">Análisis de valor</h2>
+    <div class="matrix-container">
+      <table class="price-matrix sortable" id="value-table">
+        <thead><tr>{header_html}</tr></thead>
+        <tbody>
+{rows}        </tbody>
+      </table>
+    </div>
+"""
+
+def generate_steam_matrix_html(steam_matrix: dict) -> str:
+    regions = steam_matrix.get("regions", [])
+    prices = steam_matrix.get("prices", {})
+    if not regions or not prices: return ""
+    header = "".join(f"<th>{cc}</th>" for cc in regions)
+    rows = ""
+    for name, by_region in prices.items():
+        cells = "".join(f"<td>{by_region.get(cc, 'N/A')}</td>" for cc in regions)
+        rows += f"          <tr><th>{name}</th>{cells}</tr>\n"
+    return f"""    <h2 class="section-title">Precios de Steam por región</h2>
+    <div class="matrix-container">
+      <table class="price-matrix">
+        <thead><tr><th>Juego</th>{header}</tr></thead>
+        <tbody>
+{rows}        </tbody>
+      </table>
+    </div>
+"""
+
+def generate_html(results: list, images_path="images.json", steam_matrix: dict = None, analytics: dict = None):
     try:
         with open(images_path, encoding="utf-8") as f: images = json.load(f)
     except Exception: images = {}
@@ -391,6 +646,29 @@ def generate_html(results: list, images_path="images.json"):
       transition: color 0.2s, transform 0.2s;
     }
     .close:hover { color: #fff; transform: scale(1.1); }
+    .section-title { margin: 50px 0 20px; font-size: 1.5rem; font-weight: 700; color: #fff; text-align: center; }
+    .matrix-container {
+      overflow-x: auto;
+      border: 1px solid var(--border-color);
+      border-radius: 12px;
+      background: var(--surface-color);
+      box-shadow: 0 4px 15px var(--shadow-color);
+    }
+    .price-matrix { width: 100%; border-collapse: collapse; font-size: 0.9rem; }
+    .price-matrix th, .price-matrix td {
+      padding: 8px 12px;
+      border-bottom: 1px solid var(--border-color);
+      text-align: right;
+      white-space: nowrap;
+    }
+    .price-matrix thead th { color: #fff; position: sticky; top: 0; background: var(--surface-color); }
+    .price-matrix tbody th { text-align: left; font-weight: 600; }
+    .price-matrix td { color: var(--secondary-text); }
+    .price-matrix td:first-child { text-align: left; color: var(--primary-text); }
+    .sortable thead th { cursor: pointer; user-select: none; }
+    .sortable thead th:hover { color: var(--accent-color); }
+    .sortable thead th.asc::after { content: " ▲"; }
+    .sortable thead th.desc::after { content: " ▼"; }
     @keyframes fadeInModal {
       from { opacity: 0; transform: translateY(-30px) scale(0.95); }
       to { opacity: 1; transform: translateY(0) scale(1); }
@@ -422,7 +700,10 @@ def generate_html(results: list, images_path="images.json"):
 '''
     html += """    </div>
     <div id="no-results-message">No se encontraron resultados para tu búsqueda.</div>
-  </div>
+"""
+    if analytics: html += generate_value_table_html(results, analytics)
+    if steam_matrix: html += generate_steam_matrix_html(steam_matrix)
+    html += """  </div>
 
   <div id="modal" class="modal">
     <div class="modal-content">
@@ -504,13 +785,36 @@ def generate_html(results: list, images_path="images.json"):
             noResultsMessage.style.display = 'none';
         }
     });
+
+    // --- Sortable Tables ---
+    document.querySelectorAll('table.sortable').forEach(table => {
+      const tbody = table.querySelector('tbody');
+      table.querySelectorAll('thead th').forEach(th => {
+        th.addEventListener('click', () => {
+          const col = Number(th.dataset.col);
+          const asc = !th.classList.contains('asc');
+          table.querySelectorAll('thead th').forEach(h => h.classList.remove('asc', 'desc'));
+          th.classList.add(asc ? 'asc' : 'desc');
+          const rows = Array.from(tbody.rows);
+          rows.sort((a, b) => {
+            const va = a.cells[col].dataset.value, vb = b.cells[col].dataset.value;
+            // Celdas vacías (sin dato) siempre al final
+            if (va === '' || vb === '') { return (va === '') - (vb === ''); }
+            const na = Number(va), nb = Number(vb);
+            const cmp = (isNaN(na) || isNaN(nb)) ? va.localeCompare(vb) : na - nb;
+            return asc ? cmp : -cmp;
+          });
+          rows.forEach(row => tbody.appendChild(row));
+        });
+      });
+    });
   </script>
 </body>
 </html>"""
     with open("report.html", "w", encoding="utf-8") as f: f.write(html)
     if results: print("✔ report.html generado")
 
-def main():
+def main(steam_regions: list = None):
     games_file_path = os.path.join(os.path.dirname(__file__), "games.txt")
     if not os.path.exists(games_file_path):
         try:
@@ -526,16 +830,43 @@ def main():
 
     start_time = time.time()
     
-    loaded_metacritic_scores = load_metacritic_scores(METACRITIC_SCORES_FILE)
-    loaded_hltb_times = load_hltb_times(HLTB_TIMES_FILE)
+    with stage("cargar_datos"):
+        loaded_metacritic_scores = load_metacritic_scores(METACRITIC_SCORES_FILE)
+        loaded_hltb_times = load_hltb_times(HLTB_TIMES_FILE)
     
-    price_results = scrape_all_prices(games_from_file, loaded_metacritic_scores, loaded_hltb_times, max_workers=7)
+    with stage("precios"):
+        price_results = scrape_all_prices(games_from_file, loaded_metacritic_scores, loaded_hltb_times, max_workers=7)
+    steam_matrix = None
+    if steam_regions:
+        with stage("steam_regiones"):
+            steam_matrix = scrape_steam_price_matrix(games_from_file, steam_regions, max_workers=7)
     
     if price_results: 
-        generate_html(price_results)
+        with stage("analitica"): analytics = analyze_prices(price_results)
+        save_results(price_results, steam_matrix, analytics=analytics)
+        with stage("generar_html"): generate_html(price_results, steam_matrix=steam_matrix, analytics=analytics)
     
     end_time = time.time()
     print(f"✅ Proceso completado en {end_time - start_time:.2f} segundos.")
 
+def cli(argv: list = None):
+    parser = argparse.ArgumentParser(description="Comparador de precios de los juegos de games.txt")
+    parser.add_argument("--profile", action="store_true", help="Perfila cada etapa y fuente y guarda el resultado en profiles/")
+    parser.add_argument("--report-only", action="store_true",
+                        help=f"Regenera report.html desde '{RESULTS_FILE}' sin volver a consultar las tiendas")
+    parser.add_argument("--steam-regions", nargs="*", metavar="CC",
+                        help=f"Añade la matriz de precios de Steam por país (por defecto: {' '.join(STEAM_REGIONS)})")
+    args = parser.parse_args(argv)
+    steam_regions = None
+    if args.steam_regions is not None:
+        steam_regions = [cc.upper() for arg in args.steam_regions for cc in arg.split(",") if cc] or STEAM_REGIONS
+    run = rebuild_report if args.report_only else (lambda: main(steam_regions))
+    if args.profile:
+        profiling.start("scraper")
+        try: run()
+        finally: profiling.stop()
+    else:
+        run()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,90 @@
+# startup_budget.py
+# Mide el arranque de la ruta de solo-reporte (python scraper.py --report-only)
+# y falla si supera el presupuesto o si se cargan dependencias pesadas.
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_BUDGET_SECONDS = 0.15
+# La analítica viaja calculada en results.json, así que numpy tampoco debe cargarse
+HEAVY_MODULES = ["requests", "bs4", "playwright", "concurrent.futures", "numpy"]
+DATA_FILES = ["metacritic_scores.txt", "hltb_times.txt", "images.json"]
+
+_PROBE = f"""
+import sys
+sys.argv = ["scraper.py", "--report-only"]
+import scraper
+scraper.cli()
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+if heavy:
+    print("HEAVY:" + ",".join(heavy))
+"""
+
+
+def _prepare_workdir(workdir: str):
+    # Mismo results.json que dejaría scraper.py: datos al día y analítica ya calculada
+    sys.path.insert(0, REPO_DIR)
+    import scraper
+    with open(os.path.join(REPO_DIR, "games.txt"), encoding="utf-8") as f:
+        games = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    metacritic_scores = scraper.load_metacritic_scores(os.path.join(REPO_DIR, scraper.METACRITIC_SCORES_FILE))
+    hltb_times = scraper.load_hltb_times(os.path.join(REPO_DIR, scraper.HLTB_TIMES_FILE))
+    results = [
+        {"name": name, "steam": "N/A", "playstation": "N/A", "amazon": "N/A",
+         "metacritic": metacritic_scores.get(name, "N/A"), "hltb": hltb_times.get(name, "No disponible")}
+        for name in games
+    ]
+    analytics = {name: {"cheapest_store": None, "cheapest_cents": None, "price_per_hour": None,
+                        "score_per_dollar": None, "price_per_hour_rank": None, "score_per_dollar_rank": None}
+                 for name in games}
+    scraper.save_results(results, None, os.path.join(workdir, "results.json"), analytics=analytics)
+    for name in DATA_FILES:
+        src = os.path.join(REPO_DIR, name)
+        if os.path.exists(src):
+            shutil.copy(src, workdir)
+
+
+def measure(runs: int = 7) -> tuple:
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    timings, heavy = [], set()
+    with tempfile.TemporaryDirectory() as workdir:
+        _prepare_workdir(workdir)
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-c", _PROBE], cwd=workdir, env=env,
+                                  capture_output=True, text=True, encoding="utf-8")
+            timings.append(time.perf_counter() - t0)
+            if proc.returncode != 0:
+                raise RuntimeError(proc.stderr.strip())
+            for line in proc.stdout.splitlines():
+                if line.startswith("HEAVY:"):
+                    heavy.update(line[len("HEAVY:"):].split(","))
+    return statistics.median(timings), sorted(heavy)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Presupuesto de arranque de scraper.py --report-only")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS, help="Segundos (mediana)")
+    args = parser.parse_args()
+
+    median, heavy = measure(args.runs)
+    print(f"ℹ️ --report-only: mediana {median * 1000:.1f} ms en {args.runs} ejecuciones (presupuesto {args.budget * 1000:.0f} ms)")
+    if heavy:
+        print(f"❌ Se importaron dependencias pesadas: {', '.join(heavy)}")
+        return 1
+    if median > args.budget:
+        print("❌ Presupuesto de arranque excedido")
+        return 1
+    print("✅ Dentro del presupuesto")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())